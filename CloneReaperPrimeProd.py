@@ -15,17 +15,32 @@ import time
 import logging
 import json
 import csv
+import filecmp
 import shutil
-import argparse
-from multiprocessing import Pool, cpu_count
-from typing import List, Dict, Tuple, Optional, Callable, Any, NamedTuple
+import functools
+import hmac
+import threading
+import mmap
+import sqlite3
+import struct
+import io
+import errno
+from multiprocessing import cpu_count
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    List, Dict, Tuple, Optional, Callable, Any, NamedTuple, Iterator,
+    Union, Sequence
+)
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
 
+# Checked once; normalize_path and friends run for every file
+_IS_WINDOWS = platform.system() == "Windows"
+
 win32api_available = False
-if platform.system() == "Windows":
+if _IS_WINDOWS:
     try:
         import win32file
         import win32con
@@ -39,11 +54,96 @@ if platform.system() == "Windows":
         )
         pass
 
-DEFAULT_HASH_ALGO = "sha256"
-DEFAULT_CHUNK_SIZE = 65536  # 64KB for hashing
+# Optional: xxhash provides non-cryptographic hashes that run at memory speed
+xxhash_available = False
+try:
+    import xxhash
+
+    xxhash_available = True
+except ImportError:
+    pass
+
+# Optional: blake3 is a SIMD, multi-threaded cryptographic hash
+blake3_available = False
+try:
+    import blake3
+
+    blake3_available = True
+except ImportError:
+    pass
+
+# Optional: orjson serializes report JSON several times faster than json
+orjson_available = False
+try:
+    import orjson
+
+    orjson_available = True
+except ImportError:
+    pass
+
+# Optional: ijson parses imported reports incrementally, one group at a time
+ijson_available = False
+try:
+    import ijson
+
+    ijson_available = True
+except ImportError:
+    pass
+
+if blake3_available:
+    DEFAULT_HASH_ALGO = "blake3"
+elif xxhash_available:
+    DEFAULT_HASH_ALGO = "xxh3_128"
+else:
+    DEFAULT_HASH_ALGO = "sha256"
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1MB reads let hashlib release the GIL
+PARTIAL_HASH_SIZE = 65536  # 64KB sampled by the partial hash pre-check
+MMAP_THRESHOLD = 64 * 1024 * 1024  # Hash files above 64MB via mmap
+DIRECT_IO_THRESHOLD = 128 * 1024 * 1024  # Bypass the page cache above 128MB
+BLAKE3_MMAP_THRESHOLD = 1 << 20  # blake3 maps and hashes files above 1MB itself
 DEFAULT_MIN_FILE_SIZE = 1  # Minimum size in bytes to consider
 DEFAULT_WORKERS = max(1, cpu_count() // 2)
 QUARANTINE_FOLDER_NAME = "CloneReaper_Quarantine"
+HASH_CACHE_FILENAME = "clonereaper_hashes.sqlite"
+# File IDs are (device, inode) packed into 16 bytes: smaller than a tuple of
+# ints and hashed once, since bytes cache their hash.
+_FILE_ID_STRUCT = struct.Struct("<QQ")
+MAX_HASH_THREADS = 32  # Enough to keep an NVMe queue busy
+ROTATIONAL_HASH_THREADS = 2  # More concurrent reads make a spinning disk seek
+
+# Hash algorithms, sorted for the menu and as a set for membership tests.
+# The variable-length shake_* digests have no fixed hexdigest(), so they
+# are not offered.
+_AVAILABLE_ALGOS_TUPLE = tuple(sorted(
+    algo
+    for algo in (
+        hashlib.algorithms_available
+        | (xxhash.algorithms_available if xxhash_available else set())
+        | ({"blake3"} if blake3_available else set())
+    )
+    if not algo.startswith("shake_")
+))
+_AVAILABLE_ALGOS_SET = frozenset(_AVAILABLE_ALGOS_TUPLE)
+
+
+def _json_bytes(obj: Any, indent: bool = False) -> bytes:
+    """Serializes obj to UTF-8 JSON, using orjson when available."""
+    if orjson_available:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(
+        obj, ensure_ascii=False, indent=2 if indent else None
+    ).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parses UTF-8 JSON, using orjson when available.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    catch the same exception either way.
+    """
+    if orjson_available:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 class Config:
@@ -53,10 +153,18 @@ class Config:
         # Core Scan Settings
         self.directory: str = ""
         self.min_size: int = DEFAULT_MIN_FILE_SIZE
+        self.include_empty_files: bool = False  # Only applies if min_size is 0
         self.hash_algo: str = DEFAULT_HASH_ALGO
         self.partial_hash: bool = False
+        self.verify_duplicates: bool = False
+        self.collapse_duplicate_dirs: bool = False
         self.workers: int = DEFAULT_WORKERS
 
+        # Hash Cache Settings
+        self.use_hash_cache: bool = False
+        self.hash_cache_path: str = HASH_CACHE_FILENAME
+        self.cache_invalidate_days: int = 0  # 0 keeps entries indefinitely
+
         # Feature Toggles
         self.check_hardlinks: bool = win32api_available
         self.long_paths_enabled: bool = False
@@ -67,7 +175,6 @@ class Config:
         self.action_mode: str = "none"
         self.keep_strategy: str = "first"
         self.quarantine_path: Optional[str] = None
-        self.confirmations: int = 2
 
         # Reporting Settings
         self.enable_reports: bool = False
@@ -84,8 +191,8 @@ class Config:
         print(f"Saving configuration to {path}...")
         try:
             # We save the __dict__ which contains all the instance attributes
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self.__dict__, f, indent=2)
+            with open(path, "wb") as f:
+                f.write(_json_bytes(self.__dict__, indent=True))
         except IOError as e:
             print(f"Error: Could not save configuration file: {e}")
 
@@ -94,11 +201,17 @@ class Config:
         """Loads configuration from a JSON file, or returns a default config."""
         config = Config()  # Start with a default config
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                loaded_data = json.load(f)
+            with open(path, "rb") as f:
+                loaded_data = _json_loads(f.read())
                 # Update the default config with the loaded data
                 config.__dict__.update(loaded_data)
             print(f"Configuration loaded from {path}.")
+            if config.hash_algo not in _AVAILABLE_ALGOS_SET:
+                print(
+                    f"Hash algorithm '{config.hash_algo}' is not available. "
+                    f"Using {DEFAULT_HASH_ALGO}."
+                )
+                config.hash_algo = DEFAULT_HASH_ALGO
         except FileNotFoundError:
             print("No configuration file found. Using default settings.")
         except (json.JSONDecodeError, TypeError) as e:
@@ -106,6 +219,73 @@ class Config:
         return config
 
 
+class ScannedFile(NamedTuple):
+    """A file found by the size scan, with the ID read from its stat."""
+
+    path: str
+    file_id: Optional[bytes]  # Packed (st_dev, st_ino), None if unknown
+    mtime_ns: int
+
+
+class ScanResult(NamedTuple):
+    """Totals for the final duplicate groups, computed once."""
+
+    wasted_bytes: int
+    file_count: int  # Files an action would touch: all but one per group
+
+
+class HashCache:
+    """Persistent SQLite store of full-file hashes.
+
+    An entry is only reused while the file's size, mtime and the hash
+    algorithm all match, so a re-scan only reads files that changed.
+    """
+
+    def __init__(self, path: str, hash_algo: str, invalidate_days: int = 0):
+        self.hash_algo = hash_algo
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "algo TEXT, hash TEXT, hashed_at REAL)"
+        )
+        if invalidate_days > 0:
+            cutoff = time.time() - invalidate_days * 86400
+            deleted = self.conn.execute(
+                "DELETE FROM hashes WHERE hashed_at < ?", (cutoff,)
+            ).rowcount
+            logging.debug(f"Dropped {deleted} hash cache entries older than "
+                          f"{invalidate_days} days.")
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[str]:
+        """Returns the cached hash of path, or None if it is stale or missing."""
+        row = self.conn.execute(
+            "SELECT hash FROM hashes "
+            "WHERE path = ? AND size = ? AND mtime_ns = ? AND algo = ?",
+            (os.path.abspath(path), size, mtime_ns, self.hash_algo),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, entries: List[Tuple[str, int, int, str]]):
+        """Stores (path, size, mtime_ns, hash) entries in one transaction."""
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (os.path.abspath(path), size, mtime_ns,
+                     self.hash_algo, file_hash, now)
+                    for path, size, mtime_ns, file_hash in entries
+                ),
+            )
+
+    def close(self):
+        self.conn.close()
+
+
 def setup_logging(level: int):
     """Configures logging."""
     logging.basicConfig(
@@ -115,8 +295,12 @@ def setup_logging(level: int):
     )
 
 
+@functools.lru_cache(maxsize=4096)
 def format_bytes(size: int) -> str:
-    """Formats bytes into a human-readable string."""
+    """Formats bytes into a human-readable string.
+
+    Memoized: result listings repeat the same few sizes many times.
+    """
     if size < 1024:
         return f"{size} B"
     for unit in ["KB", "MB", "GB", "TB"]:
@@ -128,17 +312,30 @@ def format_bytes(size: int) -> str:
 
 def normalize_path(path: str, config: Config) -> str:
     """Adds Windows long path prefix if enabled."""
-    if (
-            config.long_paths_enabled
-            and platform.system() == "Windows"
-            and not path.startswith("\\\\?\\")
-    ):
+    if not config.long_paths_enabled or not _IS_WINDOWS:
+        return path
+    if not path.startswith("\\\\?\\"):
         # Use os.path.abspath to handle relative paths correctly
         return "\\\\?\\" + os.path.abspath(path)
     return path
 
 
-def get_file_id_windows(file_path: str) -> Optional[Tuple[int, int]]:
+def pack_file_id(device: int, inode: int) -> bytes:
+    """Packs a device and inode number into a 16-byte file ID."""
+    return _FILE_ID_STRUCT.pack(device, inode)
+
+
+def file_id_device(file_id: bytes) -> bytes:
+    """Returns the device part of a packed file ID, for comparisons."""
+    return file_id[:8]
+
+
+def format_file_id(file_id: Any) -> str:
+    """Formats a file ID for display; IDs from reports are already text."""
+    return file_id.hex() if isinstance(file_id, bytes) else str(file_id)
+
+
+def get_file_id_windows(file_path: str) -> Optional[bytes]:
     """Gets the unique file ID from NTFS MFT (Windows only)."""
     if not win32api_available:
         return None
@@ -154,56 +351,220 @@ def get_file_id_windows(file_path: str) -> Optional[Tuple[int, int]]:
             win32con.FILE_FLAG_BACKUP_SEMANTICS,
             None,
         )
-        # The pywin32 function returns a tuple of 10 items.
-        # The file index high/low are the 9th and 10th items (index 8 and 9).
+        # The pywin32 function returns a tuple of 10 items. The volume
+        # serial number is the 5th item and the file index high/low are the
+        # 9th and 10th items (index 4, 8 and 9).
         info = win32file.GetFileInformationByHandle(handle)
         handle.Close()
-        # --- THIS IS THE FIX ---
-        # Before: return (info.nFileIndexHigh, info.nFileIndexLow)
-        # After:
-        return (info[8], info[9])
+        return pack_file_id(info[4], (info[8] << 32) | info[9])
     except Exception as e:
         logging.warning(f"Could not get file ID for {file_path}: {e}")
         return None
 
 
-def get_file_id_linux(file_path: str) -> Optional[Tuple[int, int]]:
+def get_file_id_linux(file_path: str) -> Optional[bytes]:
     """Gets the unique file ID (device and inode) on Linux."""
     try:
         stat_info = os.stat(file_path)
-        return (stat_info.st_dev, stat_info.st_ino)
+        return pack_file_id(stat_info.st_dev, stat_info.st_ino)
     except OSError as e:
         logging.warning(f"Could not get file ID for {file_path}: {e}")
         return None
 
 
-def get_file_id(file_path: str) -> Optional[Tuple[int, int]]:
+def get_file_id(file_path: str) -> Optional[bytes]:
     """Platform-agnostic file ID getter."""
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         return get_file_id_windows(file_path)
     else:
         return get_file_id_linux(file_path)
 
 
+@functools.lru_cache(maxsize=None)
+def _is_rotational_device(st_dev: int) -> bool:
+    """Returns True if st_dev is a spinning disk, as reported by Linux sysfs.
+
+    Partitions have no queue directory of their own, so the parent disk's
+    is checked too. Unknown devices (and other platforms) count as SSDs.
+    """
+    device_dir = os.path.realpath(
+        f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}"
+    )
+    for candidate in (device_dir, os.path.dirname(device_dir)):
+        try:
+            with open(os.path.join(candidate, "queue", "rotational")) as f:
+                return f.read().strip() == "1"
+        except OSError:
+            continue
+    return False
+
+
+def hash_thread_count(config: Config) -> int:
+    """Returns how many threads should read and hash files concurrently."""
+    if sys.platform.startswith("linux"):
+        try:
+            if _is_rotational_device(os.stat(config.directory).st_dev):
+                return ROTATIONAL_HASH_THREADS
+        except OSError:
+            pass
+    return min(MAX_HASH_THREADS, config.workers * 4)
+
+
 # --- Core Logic (Largely unchanged, but adapted to use Config object) ---
+def new_hasher(hash_algo: str) -> Any:
+    """Creates a hash object for a hashlib, xxhash or blake3 algorithm."""
+    if blake3_available and hash_algo == "blake3":
+        return blake3.blake3()
+    if xxhash_available and hash_algo in xxhash.algorithms_available:
+        return getattr(xxhash, hash_algo)()
+    return hashlib.new(hash_algo)
+
+
+def hex_digest(hasher: Any) -> str:
+    """Returns a hasher's hex digest.
+
+    Variable-length algorithms (shake_128/256) report a digest size of 0
+    and need an explicit length, so they produce 32 bytes.
+    """
+    if getattr(hasher, "digest_size", None) == 0:
+        return hasher.hexdigest(32)
+    return hasher.hexdigest()
+
+
+def needs_verification(config: Config) -> bool:
+    """Returns True if hash matches must be confirmed byte-for-byte.
+
+    xxhash collisions can be built on purpose, so a match from one is never
+    enough on its own to delete a file or replace it with a link.
+    """
+    if config.verify_duplicates:
+        return True
+    return (
+        config.action_mode in ("delete", "link")
+        and xxhash_available
+        and config.hash_algo in xxhash.algorithms_available
+    )
+
+
+def _fadvise(fd: int, advice: str):
+    """Gives the kernel a whole-file access hint where posix_fadvise exists."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+    except OSError as e:
+        logging.debug(f"posix_fadvise({advice}) failed: {e}")
+
+
+def _hash_mapped_file(f, hash_algo: str) -> Optional[Any]:
+    """Hashes an open file through a read-only memory map.
+
+    Returns None if the file cannot be mapped (e.g. it is empty, or too
+    large for a 32-bit address space) so the caller can fall back to reads.
+    """
+    try:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            hasher = new_hasher(hash_algo)
+            hasher.update(mm)
+            return hasher
+    except (ValueError, OverflowError, OSError) as e:
+        logging.debug(f"Memory map unavailable for {f.name}: {e}")
+        return None
+
+
+def _hash_direct(norm_path: str, hash_algo: str) -> Optional[Any]:
+    """Hashes a file with O_DIRECT reads that bypass the page cache (Linux).
+
+    O_DIRECT needs an aligned buffer, so reads go into an anonymous mmap,
+    which is always page-aligned. Returns None if the platform or the
+    filesystem does not support O_DIRECT so the caller can fall back.
+    """
+    if not hasattr(os, "O_DIRECT"):
+        return None
+    try:
+        fd = os.open(norm_path, os.O_RDONLY | os.O_DIRECT)
+    except OSError as e:
+        if e.errno != errno.EINVAL:
+            raise
+        return None
+    with io.FileIO(fd, "rb") as f, mmap.mmap(-1, DEFAULT_CHUNK_SIZE) as buf:
+        view = memoryview(buf)
+        try:
+            hasher = new_hasher(hash_algo)
+            while n := f.readinto(view):
+                hasher.update(view[:n])
+            return hasher
+        except OSError as e:
+            if e.errno != errno.EINVAL:
+                raise
+            logging.debug(f"O_DIRECT reads unsupported for {norm_path}: {e}")
+            return None
+        finally:
+            view.release()
+
+
+def _read_at(f, offset: int, length: int) -> bytes:
+    """Reads length bytes at offset, with os.pread where it exists."""
+    if hasattr(os, "pread"):
+        return os.pread(f.fileno(), length, offset)
+    f.seek(offset)
+    return f.read(length)
+
+
+def compute_sample_hash_worker(
+        file_path: str, size: int, config: Config
+) -> Tuple[str, Optional[str]]:
+    """Worker function that hashes the first and last PARTIAL_HASH_SIZE bytes.
+
+    Used to split size groups cheaply before any file is read in full.
+    """
+    norm_path = normalize_path(file_path, config)
+    try:
+        with open(norm_path, "rb") as f:
+            hasher = new_hasher(config.hash_algo)
+            hasher.update(_read_at(f, 0, PARTIAL_HASH_SIZE))
+            hasher.update(
+                _read_at(f, max(0, size - PARTIAL_HASH_SIZE), PARTIAL_HASH_SIZE)
+            )
+        return file_path, hex_digest(hasher)
+    except OSError as e:
+        logging.warning(f"Could not hash file {file_path}: {e}")
+        return file_path, None
+    except Exception as e:
+        logging.error(f"Unexpected error hashing {file_path}: {e}")
+        return file_path, None
+
+
 def compute_hash_worker(
-        args_tuple: Tuple[str, Config]
+        file_path: str, config: Config
 ) -> Tuple[str, Optional[str]]:
-    """Worker function for parallel hashing."""
-    file_path, config = args_tuple
+    """Worker function for parallel hashing of whole files."""
     norm_path = normalize_path(file_path, config)
     try:
-        hasher = hashlib.new(config.hash_algo)
         with open(norm_path, "rb") as f:
-            if config.partial_hash:
-                chunk = f.read(DEFAULT_CHUNK_SIZE)
-                if not chunk:
-                    return file_path, ""  # Empty file hash
-                hasher.update(chunk)
-            else:
-                while chunk := f.read(DEFAULT_CHUNK_SIZE):
-                    hasher.update(chunk)
-        return file_path, hasher.hexdigest()
+            # Read ahead aggressively; the file is streamed exactly once
+            _fadvise(f.fileno(), "POSIX_FADV_SEQUENTIAL")
+            hasher = None
+            size = os.fstat(f.fileno()).st_size
+            if config.hash_algo == "blake3" and size > BLAKE3_MMAP_THRESHOLD:
+                # update_mmap maps the file and hashes it across threads
+                # with the GIL released
+                hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                hasher.update_mmap(norm_path)
+            elif size > DIRECT_IO_THRESHOLD:
+                hasher = _hash_direct(norm_path, config.hash_algo)
+            if hasher is None and size > MMAP_THRESHOLD:
+                hasher = _hash_mapped_file(f, config.hash_algo)
+            if hasher is None:
+                # Read into one reused buffer; hashlib.file_digest would do
+                # the same loop in Python, but with a fixed 256KB buffer
+                hasher = new_hasher(config.hash_algo)
+                view = memoryview(bytearray(DEFAULT_CHUNK_SIZE))
+                while n := f.readinto(view):
+                    hasher.update(view[:n])
+            # Drop the pages so a big scan does not evict the page cache
+            _fadvise(f.fileno(), "POSIX_FADV_DONTNEED")
+        return file_path, hex_digest(hasher)
     except (OSError, IOError) as e:
         logging.warning(f"Could not hash file {file_path}: {e}")
         return file_path, None
@@ -212,37 +573,103 @@ def compute_hash_worker(
         return file_path, None
 
 
+def compare_pair_worker(
+        pair: Tuple[str, str], config: Config
+) -> bool:
+    """Worker function that compares two files byte-for-byte.
+
+    filecmp stops at the first differing block, so a pair of unrelated
+    files costs a single read of each instead of two full hashes.
+    """
+    first, second = pair
+    try:
+        return filecmp.cmp(
+            normalize_path(first, config),
+            normalize_path(second, config),
+            shallow=False,
+        )
+    except OSError as e:
+        logging.warning(f"Could not compare {first} and {second}: {e}")
+        return False
+
+
+def _scandir_recursive(
+        path: str, onerror: Optional[Callable[[OSError], None]] = None
+) -> Iterator[os.DirEntry]:
+    """Yields a DirEntry for every regular file below path, skipping symlinks."""
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_symlink():
+                    continue
+                if entry.is_file(follow_symlinks=False):
+                    yield entry
+                elif entry.is_dir(follow_symlinks=False):
+                    yield from _scandir_recursive(entry.path, onerror)
+    except OSError as e:
+        if onerror is not None:
+            onerror(e)
+
+
 def find_potential_duplicates_by_size(
         config: Config,
-) -> Dict[int, List[str]]:
-    """Scans directory and groups files by size."""
-    files_by_size = collections.defaultdict(list)
+) -> Tuple[
+    Dict[int, List[ScannedFile]], Dict[bytes, Tuple[int, List[str]]]
+]:
+    """Scans directory and groups files by size.
+
+    Also returns every file with more than one link, keyed by file ID as
+    (size, paths), so hardlinks can be found without touching disk again.
+    """
+    # Most sizes are unique, so a size holds a bare ScannedFile until a
+    # second file of that size promotes it to a list.
+    files_by_size: Dict[int, Union[ScannedFile, List[ScannedFile]]] = {}
+    linked_files: Dict[bytes, Tuple[int, List[str]]] = {}
     print(
         f"\nScanning directory: {config.directory} for files >= {config.min_size} bytes..."
     )
     count = 0
     skipped_unreadable = 0
-    for root, _, files in os.walk(config.directory, topdown=True):
-        if count % 5000 == 0 and count > 0:
-            print(f"  ...scanned {count} files", end="\r")
 
-        for filename in files:
-            file_path = os.path.join(root, filename)
-            norm_path = normalize_path(file_path, config)
-            try:
-                # Use lstat to handle symlinks correctly
-                stat_info = os.lstat(norm_path)
-                if not os.path.isfile(norm_path):
-                    continue
-                file_size = stat_info.st_size
-                if file_size >= config.min_size:
-                    files_by_size[file_size].append(file_path)
-                    count += 1
-            except FileNotFoundError:
-                logging.debug(f"File vanished during scan: {file_path}")
-            except OSError as e:
-                logging.warning(f"Could not access {file_path}: {e}")
-                skipped_unreadable += 1
+    def on_scan_error(error: OSError):
+        nonlocal skipped_unreadable
+        logging.warning(f"Could not access {error.filename}: {error}")
+        skipped_unreadable += 1
+
+    for entry in _scandir_recursive(config.directory, on_scan_error):
+        file_path = entry.path
+        try:
+            # DirEntry caches the stat from the directory read where possible
+            stat_info = entry.stat(follow_symlinks=False)
+            file_size = stat_info.st_size
+            if file_size >= config.min_size:
+                # Windows directory listings report st_ino as 0; the
+                # hardlink check looks those files up separately.
+                file_id = (
+                    pack_file_id(stat_info.st_dev, stat_info.st_ino)
+                    if stat_info.st_ino
+                    else None
+                )
+                scanned = ScannedFile(file_path, file_id, stat_info.st_mtime_ns)
+                if file_id and stat_info.st_nlink > 1:
+                    linked_files.setdefault(file_id, (file_size, []))[1].append(
+                        file_path
+                    )
+                existing = files_by_size.get(file_size)
+                if existing is None:
+                    files_by_size[file_size] = scanned
+                elif isinstance(existing, list):
+                    existing.append(scanned)
+                else:
+                    files_by_size[file_size] = [existing, scanned]
+                count += 1
+                if count % 5000 == 0:
+                    print(f"  ...scanned {count} files", end="\r")
+        except FileNotFoundError:
+            logging.debug(f"File vanished during scan: {file_path}")
+        except OSError as e:
+            logging.warning(f"Could not access {file_path}: {e}")
+            skipped_unreadable += 1
 
     print(f"  ...scanned {count} files total.                 ")
     if skipped_unreadable > 0:
@@ -251,61 +678,90 @@ def find_potential_duplicates_by_size(
         )
 
     potential_duplicates = {
-        size: paths
-        for size, paths in files_by_size.items()
-        if len(paths) > 1
+        size: files
+        for size, files in files_by_size.items()
+        if isinstance(files, list)
     }
     print(
         f"Found {len(potential_duplicates)} sizes with potential duplicates."
     )
-    return potential_duplicates
+    return potential_duplicates, linked_files
 
 
 def identify_hardlinks(
-        potential_groups: Dict[int, List[str]], config: Config
-) -> Tuple[Dict[int, List[str]], Dict[Tuple[int, int], List[str]], int]:
-    """Identifies hardlinks within size groups."""
+        potential_groups: Dict[int, List[ScannedFile]],
+        linked_files: Dict[bytes, Tuple[int, List[str]]],
+        config: Config,
+) -> Tuple[
+    Dict[int, List[ScannedFile]],
+    Dict[bytes, Tuple[int, List[str]]],
+    int,
+]:
+    """Identifies hardlinks within size groups.
+
+    Files whose ID came from the scan are matched against linked_files, the
+    multi-link map built by the scan; only files without an ID (Windows)
+    are looked up here, and the remaining files carry the looked-up ID on.
+    Hardlink sets are returned as file ID -> (file size, linked paths).
+    """
     print("Checking for hardlinks...")
-    hardlinks_found: Dict[
-        Tuple[int, int], List[str]
-    ] = collections.defaultdict(list)
+    hardlinks_found: Dict[bytes, Tuple[int, List[str]]] = {
+        file_id: (size, paths)
+        for file_id, (size, paths) in linked_files.items()
+        if len(paths) > 1
+    }
     groups_to_check = {}
-    hardlink_space = 0
-    processed_files = 0
-    total_files = sum(len(paths) for paths in potential_groups.values())
+    hardlink_space = sum(
+        size * (len(paths) - 1) for size, paths in hardlinks_found.values()
+    )
 
-    for size, paths in potential_groups.items():
-        files_by_id = collections.defaultdict(list)
-        for path in paths:
-            processed_files += 1
-            if processed_files % 100 == 0:
-                print(
-                    f"  ...checking hardlink {processed_files}/{total_files}",
-                    end="\r",
-                )
-            norm_path = normalize_path(path, config)
-            file_id = get_file_id(norm_path)
-            if file_id:
-                files_by_id[file_id].append(path)
-
-        remaining_paths = []
-        for file_id, linked_paths in files_by_id.items():
-            if len(linked_paths) > 1:
-                hardlinks_found[file_id].extend(linked_paths)
-                hardlink_space += size * (len(linked_paths) - 1)
-            else:
-                remaining_paths.extend(linked_paths)
+    # Most files already carry their ID from the scan; only look up the rest
+    unresolved_paths = [
+        scanned.path
+        for files in potential_groups.values()
+        for scanned in files
+        if scanned.file_id is None
+    ]
+    looked_up_ids: Dict[str, Optional[bytes]] = {}
+    if unresolved_paths:
+        processed_files = 0
+        total_files = len(unresolved_paths)
+        # File ID lookups are pure syscalls that release the GIL, so a thread
+        # pool overlaps their latency across disks.
+        with ThreadPoolExecutor(max_workers=config.workers * 4) as executor:
+            file_ids = executor.map(
+                get_file_id,
+                (normalize_path(p, config) for p in unresolved_paths),
+            )
+            for path, file_id in zip(unresolved_paths, file_ids):
+                processed_files += 1
+                if processed_files % 100 == 0:
+                    print(
+                        f"  ...checking hardlink {processed_files}/{total_files}",
+                        end="\r",
+                    )
+                looked_up_ids[path] = file_id
+
+    for size, files in potential_groups.items():
+        looked_up_by_id = collections.defaultdict(list)
+        for scanned in files:
+            if not scanned.file_id and looked_up_ids.get(scanned.path):
+                looked_up_by_id[looked_up_ids[scanned.path]].append(scanned.path)
+        for file_id, paths in looked_up_by_id.items():
+            if len(paths) > 1:
+                hardlinks_found[file_id] = (size, paths)
+                hardlink_space += size * (len(paths) - 1)
 
-        # Handle files where ID could not be retrieved
-        paths_without_id = [
-            p
-            for p in paths
-            if get_file_id(normalize_path(p, config)) is None
-        ]
-        remaining_paths.extend(paths_without_id)
+        # Files whose ID could not be retrieved are kept as well
+        remaining_files = []
+        for scanned in files:
+            if not scanned.file_id and looked_up_ids.get(scanned.path):
+                scanned = scanned._replace(file_id=looked_up_ids[scanned.path])
+            if scanned.file_id not in hardlinks_found:
+                remaining_files.append(scanned)
 
-        if len(remaining_paths) > 1:
-            groups_to_check[size] = remaining_paths
+        if len(remaining_files) > 1:
+            groups_to_check[size] = remaining_files
 
     print(
         f"Hardlink check complete. Found {len(hardlinks_found)} sets.          "
@@ -316,90 +772,244 @@ def identify_hardlinks(
     return groups_to_check, hardlinks_found, hardlink_space
 
 
-def identify_duplicates_by_hash(
-        groups_to_check: Dict[int, List[str]], config: Config
-) -> Dict[str, List[str]]:
-    """Identifies duplicates by hashing files."""
-    if not groups_to_check:
-        return {}
+def drop_unlinkable_files(
+        groups: Dict[int, List[ScannedFile]]
+) -> Dict[int, List[ScannedFile]]:
+    """Removes files with no same-size peer on their own device.
+
+    Hardlinks cannot cross filesystems, so in link mode such files could
+    never be processed and hashing them is wasted work. Files that remain
+    are only sampled and grouped with files on their own device (see
+    _link_device), so a duplicate set never spans devices. Groups
+    containing a file whose device is unknown are kept whole; on Windows
+    the device is only known once identify_hardlinks has looked the file up.
+    """
+    kept_groups = {}
+    skipped_files = 0
+    skipped_bytes = 0
+    for size, files in groups.items():
+        if any(f.file_id is None for f in files):
+            kept_groups[size] = files
+            continue
+        files_per_device = collections.Counter(
+            file_id_device(f.file_id) for f in files
+        )
+        kept = [
+            f for f in files if files_per_device[file_id_device(f.file_id)] > 1
+        ]
+        skipped_files += len(files) - len(kept)
+        skipped_bytes += size * (len(files) - len(kept))
+        if len(kept) > 1:
+            kept_groups[size] = kept
 
+    if skipped_files:
+        print(
+            f"Skipping {skipped_files} files ({format_bytes(skipped_bytes)}) "
+            f"with no same-size file on their device to link to."
+        )
+    return kept_groups
+
+
+def _link_device(scanned: ScannedFile, config: Config) -> bytes:
+    """Returns the device duplicates of scanned must share, or b"" if any.
+
+    Only link mode cares: a hardlink cannot point to another filesystem.
+    """
+    if config.action_mode != "link" or scanned.file_id is None:
+        return b""
+    return file_id_device(scanned.file_id)
+
+
+def partial_hash_groups(
+        scanned_groups: Dict[int, List[ScannedFile]], config: Config
+) -> Dict[int, List[ScannedFile]]:
+    """Splits size groups by a hash of each file's head and tail.
+
+    Only files that still share a sample hash with another file stay in
+    their group. Pairs are left for filecmp, which stops at the first
+    difference anyway, and files up to twice the sample size are left
+    whole because sampling them reads almost as much as hashing them.
+    """
+    print("Performing partial hash check...")
+    sample_paths = []
+    sample_sizes = []
+    sample_devices = []
+    for size, files in scanned_groups.items():
+        if len(files) > 2 and size > 2 * PARTIAL_HASH_SIZE:
+            sample_paths.extend(scanned.path for scanned in files)
+            sample_sizes.extend([size] * len(files))
+            sample_devices.extend(
+                _link_device(scanned, config) for scanned in files
+            )
+    if not sample_paths:
+        print("No groups need a partial hash check.")
+        return scanned_groups
+
+    num_threads = hash_thread_count(config)
     print(
-        f"\nStarting hash comparison (Algorithm: {config.hash_algo}, "
-        f"Partial Check: {config.partial_hash})..."
+        f"Hashing (partial) {len(sample_paths)} files using "
+        f"{num_threads} threads..."
     )
-    duplicates: Dict[str, List[str]] = collections.defaultdict(list)
-    files_to_hash_full = []
-
-    # --- Stage 1: Partial Hashing (if enabled) ---
-    if config.partial_hash:
-        print("Performing partial hash check...")
-        files_to_hash_partial = [
-            (path, config)
-            for paths in groups_to_check.values()
-            for path in paths
-        ]
-        print(
-            f"Hashing (partial) {len(files_to_hash_partial)} files using "
-            f"{config.workers} workers..."
+    # The first path seen for a (size, sample hash) waits here; a second hit
+    # keeps both and leaves None so later hits are kept directly.
+    seen_sample: Dict[Tuple[int, bytes, str], Optional[str]] = {}
+    colliding = set()
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        results = executor.map(
+            functools.partial(compute_sample_hash_worker, config=config),
+            sample_paths,
+            sample_sizes,
         )
+        for size, device, (path, sample_hash) in zip(
+                sample_sizes, sample_devices, results
+        ):
+            if sample_hash is None:
+                continue
+            key = (size, device, sample_hash)
+            if key not in seen_sample:
+                seen_sample[key] = path
+                continue
+            first_path = seen_sample[key]
+            if first_path is not None:
+                colliding.add(first_path)
+                seen_sample[key] = None
+            colliding.add(path)
+
+    remaining = {}
+    for size, files in scanned_groups.items():
+        if len(files) > 2 and size > 2 * PARTIAL_HASH_SIZE:
+            files = [scanned for scanned in files if scanned.path in colliding]
+        if len(files) > 1:
+            remaining[size] = files
+    print(
+        f"Partial hash check complete. {len(colliding)} of "
+        f"{len(sample_paths)} sampled files need a full hash."
+    )
+    return remaining
 
-        partial_hashes: Dict[str, Optional[str]] = {}
-        with Pool(processes=config.workers) as pool:
-            results = pool.map(compute_hash_worker, files_to_hash_partial)
-            for path, h in results:
-                partial_hashes[path] = h
 
-        potential_full_hash_groups = collections.defaultdict(list)
-        for size, paths in groups_to_check.items():
-            for path in paths:
-                phash = partial_hashes.get(path)
-                if phash is not None:
-                    potential_full_hash_groups[(size, phash)].append(path)
+def identify_duplicates_by_hash(
+        scanned_groups: Dict[int, List[ScannedFile]],
+        config: Config,
+        cache: Optional[HashCache] = None,
+) -> Dict[str, Tuple[int, List[str]]]:
+    """Identifies duplicates by hashing files.
+
+    Full hashes are looked up in cache first when one is given, and new
+    hashes are written back to it. Without a cache, two-file groups are
+    compared byte-for-byte instead of hashed; with one, they are hashed
+    like any other group so that re-scans can skip unchanged pairs.
+    Returns a mapping of content hash to (file size, duplicate paths).
+    """
+    if not scanned_groups:
+        return {}
+    groups_to_check = {}
+    pairs: Dict[int, Tuple[str, str]] = {}
+    # Only set in link mode, where duplicates must share a device
+    devices: Dict[str, bytes] = {
+        scanned.path: device
+        for files in scanned_groups.values()
+        for scanned in files
+        if (device := _link_device(scanned, config))
+    }
+    for size, files in scanned_groups.items():
+        # A file with a unique size cannot have a duplicate
+        if len(files) < 2:
+            continue
+        if len(files) == 2 and not cache:
+            pairs[size] = (files[0].path, files[1].path)
+        else:
+            groups_to_check[size] = [scanned.path for scanned in files]
+    # (size, mtime_ns) per path, for cache lookups and writes
+    file_stats: Dict[str, Tuple[int, int]] = {}
+    if cache:
+        for size, files in scanned_groups.items():
+            for scanned in files:
+                file_stats[scanned.path] = (size, scanned.mtime_ns)
+
+    print(f"\nStarting hash comparison (Algorithm: {config.hash_algo})...")
+    duplicates: Dict[str, Tuple[int, List[str]]] = {}
+
+    # hashlib releases the GIL on large buffers, so threads hash files in
+    # parallel without forking workers or pickling every path and result.
+    num_threads = hash_thread_count(config)
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        # --- Stage 0: Compare pairs directly instead of hashing both ---
+        if pairs:
+            print(
+                f"Comparing {len(pairs)} file pairs byte-for-byte using "
+                f"{num_threads} threads..."
+            )
+            results = executor.map(
+                functools.partial(compare_pair_worker, config=config),
+                pairs.values(),
+            )
+            for (size, pair), identical in zip(pairs.items(), results):
+                if identical:
+                    # Sizes are unique per group, so they make a stable key
+                    duplicates[f"eq:{size}"] = (size, list(pair))
+            # filecmp caches every comparison; don't hold them past the scan
+            filecmp.clear_cache()
 
-        for (size, phash), paths in potential_full_hash_groups.items():
-            if len(paths) > 1:
-                files_to_hash_full.extend(paths)
-        print(
-            f"Partial hash check complete. Identified {len(files_to_hash_full)} "
-            f"files needing full hash."
-        )
-    else:
         files_to_hash_full = [
             path for paths in groups_to_check.values() for path in paths
         ]
-        print(
-            f"Full hash check needed for {len(files_to_hash_full)} files."
-        )
-
-    # --- Stage 2: Full Hashing ---
-    if not files_to_hash_full:
-        print("No files require full hashing.")
-        return {}
-
-    print(
-        f"Performing full hash check on {len(files_to_hash_full)} files using "
-        f"{config.workers} workers..."
+        print(f"Full hash check needed for {len(files_to_hash_full)} files.")
+
+        # --- Stage 1: Full Hashing ---
+        if not files_to_hash_full:
+            print("No files require full hashing.")
+            return duplicates
+
+        final_hashes: Dict[str, Optional[str]] = {}
+        if cache:
+            uncached = []
+            for path in files_to_hash_full:
+                cached_hash = cache.get(path, *file_stats[path])
+                if cached_hash:
+                    final_hashes[path] = cached_hash
+                else:
+                    uncached.append(path)
+            print(f"Reused {len(final_hashes)} hashes from the hash cache.")
+            files_to_hash_full = uncached
+
+        if files_to_hash_full:
+            print(
+                f"Performing full hash check on {len(files_to_hash_full)} "
+                f"files using {num_threads} threads..."
+            )
+            results = executor.map(
+                functools.partial(compute_hash_worker, config=config),
+                files_to_hash_full,
+            )
+            new_entries = []
+            for path, h in results:
+                final_hashes[path] = h
+                if cache and h:
+                    new_entries.append((path, *file_stats[path], h))
+            if new_entries:
+                cache.put_many(new_entries)
+
+    # Group in scan order so the "first" keep strategy stays deterministic
+    files_by_full_hash: Dict[Tuple[int, str, bytes], List[str]] = (
+        collections.defaultdict(list)
     )
-    # Temporarily disable partial hash for the full run
-    original_partial_setting = config.partial_hash
-    config.partial_hash = False
-    files_to_hash_args = [(path, config) for path in files_to_hash_full]
-
-    final_hashes: Dict[str, Optional[str]] = {}
-    with Pool(processes=config.workers) as pool:
-        results = pool.map(compute_hash_worker, files_to_hash_args)
-        for path, h in results:
-            final_hashes[path] = h
-    config.partial_hash = original_partial_setting  # Restore setting
-
-    files_by_full_hash = collections.defaultdict(list)
-    for path, full_hash in final_hashes.items():
-        if full_hash:
-            files_by_full_hash[full_hash].append(path)
-
-    for full_hash, paths in files_by_full_hash.items():
+    for size, paths in groups_to_check.items():
+        for path in paths:
+            full_hash = final_hashes.get(path)
+            if full_hash:
+                device = devices.get(path, b"")
+                files_by_full_hash[(size, full_hash, device)].append(path)
+
+    for (size, full_hash, _), paths in files_by_full_hash.items():
         if len(paths) > 1:
-            duplicates[full_hash] = paths
+            # The same content on several devices makes one set per device
+            key = full_hash
+            copies = 0
+            while key in duplicates:
+                copies += 1
+                key = f"{full_hash}@{copies}"
+            duplicates[key] = (size, paths)
 
     print(
         f"Hash comparison complete. Found {len(duplicates)} sets of duplicate files."
@@ -407,26 +1017,209 @@ def identify_duplicates_by_hash(
     return duplicates
 
 
+def verify_group_worker(
+        group: Tuple[int, List[str]], config: Config
+) -> List[List[str]]:
+    """Worker function that splits a group into sets of identical files.
+
+    All files are read in step, one chunk at a time, and a set is split as
+    soon as its members' chunks differ, so every file is read once instead
+    of once per comparison. Files are reopened for each chunk to keep the
+    number of open files bounded for large groups. Only sets of two or more
+    files are returned, in the group's original order.
+    """
+    size, paths = group
+    identical: List[List[str]] = []
+    pending = [(0, paths)]
+    while pending:
+        offset, members = pending.pop()
+        if offset >= size:
+            identical.append(members)
+            continue
+        # (first chunk seen, files whose chunk matched it)
+        splits: List[Tuple[bytes, List[str]]] = []
+        for path in members:
+            try:
+                with open(normalize_path(path, config), "rb") as f:
+                    chunk = _read_at(f, offset, DEFAULT_CHUNK_SIZE)
+            except OSError as e:
+                logging.warning(f"Could not verify {path}: {e}")
+                continue
+            for first_chunk, same in splits:
+                if chunk == first_chunk:
+                    same.append(path)
+                    break
+            else:
+                splits.append((chunk, [path]))
+        pending.extend(
+            (offset + DEFAULT_CHUNK_SIZE, same)
+            for _, same in splits
+            if len(same) > 1
+        )
+    order = {path: i for i, path in enumerate(paths)}
+    identical.sort(key=lambda members: order[members[0]])
+    return identical
+
+
+def verify_duplicates(
+        duplicates: Dict[str, Tuple[int, List[str]]], config: Config
+) -> Dict[str, Tuple[int, List[str]]]:
+    """Confirms hash matches byte-for-byte.
+
+    Useful with non-cryptographic hashes. Groups are checked in parallel on
+    the hash thread pool. Files that differ despite sharing a hash are split
+    into separate groups; unreadable files are dropped.
+    """
+    print("Verifying duplicate groups byte-for-byte...")
+    verified: Dict[str, Tuple[int, List[str]]] = {}
+    split_groups = 0
+    # Pairs were already compared byte-for-byte while hashing
+    to_verify = [
+        group
+        for file_hash, group in duplicates.items()
+        if not file_hash.startswith("eq:")
+    ]
+    with ThreadPoolExecutor(max_workers=hash_thread_count(config)) as executor:
+        results = executor.map(
+            functools.partial(verify_group_worker, config=config), to_verify
+        )
+        for file_hash, (size, paths) in duplicates.items():
+            if file_hash.startswith("eq:"):
+                verified[file_hash] = (size, paths)
+                continue
+            identical_sets = next(results)
+            if identical_sets != [paths]:
+                split_groups += 1
+            for i, members in enumerate(identical_sets):
+                key = file_hash if i == 0 else f"{file_hash}-{i}"
+                verified[key] = (size, members)
+
+    print(
+        f"Verification complete. {split_groups} groups contained files "
+        f"that differ."
+    )
+    return verified
+
+
+def find_duplicate_directories(
+        duplicates: Dict[str, Tuple[int, List[str]]], config: Config
+) -> Dict[str, Tuple[int, List[str]]]:
+    """Finds directories whose entire contents are duplicated elsewhere.
+
+    A directory gets a Merkle-style hash over the sorted names and hashes
+    of its children, but only if every child is a duplicate file or a
+    directory that itself has a hash. Returns directory hash ->
+    (total size, directory paths), keeping only the outermost copies.
+
+    Only directories below the scan root are considered. For an imported
+    report the root is the deepest directory containing every listed file,
+    since config.directory need not relate to the report's paths.
+    """
+    print("Looking for fully duplicated directories...")
+    file_hashes: Dict[str, Tuple[str, int]] = {}
+    for file_hash, (size, paths) in duplicates.items():
+        for path in paths:
+            file_hashes[path] = (file_hash, size)
+
+    try:
+        if config.import_report_path:
+            root = os.path.commonpath(
+                [os.path.abspath(path) for path in file_hashes]
+            )
+        else:
+            root = os.path.abspath(config.directory)
+    except ValueError:
+        # Paths on different drives (Windows) share no common directory
+        print("Duplicate files share no common directory to search.")
+        return {}
+
+    # Every directory between a duplicate file and the scan root
+    candidates = set()
+    for path in file_hashes:
+        try:
+            if os.path.commonpath([os.path.abspath(path), root]) != root:
+                continue
+        except ValueError:
+            continue
+        parent = os.path.dirname(path)
+        while parent not in candidates and os.path.abspath(parent) != root:
+            candidates.add(parent)
+            parent = os.path.dirname(parent)
+
+    # Deepest first, so subdirectories are hashed before their parents
+    dir_hashes: Dict[str, Tuple[str, int]] = {}
+    by_depth = sorted(candidates, key=lambda d: d.count(os.sep), reverse=True)
+    for directory in by_depth:
+        children = []
+        total_size = 0
+        try:
+            with os.scandir(normalize_path(directory, config)) as entries:
+                for entry in entries:
+                    child_path = os.path.join(directory, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        known = dir_hashes.get(child_path)
+                    elif entry.is_file(follow_symlinks=False):
+                        known = file_hashes.get(child_path)
+                    else:
+                        known = None
+                    if known is None:
+                        break
+                    children.append(f"{entry.name}\0{known[0]}\n")
+                    total_size += known[1]
+                else:
+                    if children:
+                        hasher = new_hasher(config.hash_algo)
+                        hasher.update("".join(sorted(children)).encode("utf-8"))
+                        dir_hashes[directory] = (hex_digest(hasher), total_size)
+        except OSError as e:
+            logging.warning(f"Could not list directory {directory}: {e}")
+
+    dirs_by_hash: Dict[str, List[str]] = collections.defaultdict(list)
+    for directory, (dir_hash, _) in dir_hashes.items():
+        dirs_by_hash[dir_hash].append(directory)
+    duplicated = {
+        directory
+        for dirs in dirs_by_hash.values() if len(dirs) > 1
+        for directory in dirs
+    }
+
+    duplicate_dirs: Dict[str, Tuple[int, List[str]]] = {}
+    for dir_hash, dirs in dirs_by_hash.items():
+        # Copies nested inside an already duplicated directory add nothing
+        if len(dirs) < 2 or all(
+            os.path.dirname(d) in duplicated for d in dirs
+        ):
+            continue
+        duplicate_dirs[dir_hash] = (dir_hashes[dirs[0]][1], sorted(dirs))
+    print(f"Found {len(duplicate_dirs)} sets of duplicate directories.")
+    return duplicate_dirs
+
+
+def _is_inside_any(path: str, directories: set) -> bool:
+    """Returns True if any ancestor of path is in directories."""
+    parent = os.path.dirname(path)
+    while parent and parent not in directories:
+        next_parent = os.path.dirname(parent)
+        if next_parent == parent:
+            return False
+        parent = next_parent
+    return bool(parent)
+
+
 # --- Action and Reporting Functions ---
-def calculate_wasted_space(
-        duplicates: Dict[str, List[str]], config: Config
-) -> int:
-    """Calculates the total wasted space from duplicate files."""
+def summarize_duplicates(
+        duplicates: Dict[str, Tuple[int, List[str]]], config: Config
+) -> ScanResult:
+    """Totals the wasted space and extra copies in one pass over the groups."""
     wasted_space = 0
-    for file_list in duplicates.values():
+    file_count = 0
+    for file_size, file_list in duplicates.values():
         if not file_list:
             continue
-        try:
-            norm_path = normalize_path(file_list[0], config)
-            file_size = os.lstat(norm_path).st_size
-            if file_size >= config.min_size:
-                wasted_space += file_size * (len(file_list) - 1)
-        except OSError as e:
-            logging.warning(
-                f"Could not get size for {file_list[0]} "
-                f"during waste calculation: {e}"
-            )
-    return wasted_space
+        file_count += len(file_list) - 1
+        if file_size >= config.min_size:
+            wasted_space += file_size * (len(file_list) - 1)
+    return ScanResult(wasted_space, file_count)
 
 
 def select_file_to_keep(
@@ -471,7 +1264,7 @@ def select_file_to_keep(
 
 
 def perform_actions(
-        duplicates: Dict[str, List[str]], config: Config
+        duplicates: Dict[str, Tuple[int, List[str]]], config: Config
 ) -> Tuple[int, int]:
     """Performs the selected action (delete, quarantine, link) on duplicates."""
     if not duplicates or config.action_mode == "none":
@@ -479,6 +1272,7 @@ def perform_actions(
 
     total_processed_count = 0
     total_saved_size = 0
+    quarantine_dev = None
     action_verb = "Processing"
     if config.dry_run:
         action_verb = f"[DRY RUN] Would {config.action_mode}"
@@ -490,6 +1284,7 @@ def perform_actions(
         if not os.path.exists(config.quarantine_path):
             os.makedirs(config.quarantine_path)
             print(f"Created quarantine directory: {config.quarantine_path}")
+        quarantine_dev = os.stat(config.quarantine_path).st_dev
     elif config.action_mode == "link":
         action_verb = "Linking"
 
@@ -497,7 +1292,7 @@ def perform_actions(
         f"\n{action_verb} duplicates (keeping: {config.keep_strategy})..."
     )
 
-    for file_hash, file_list in duplicates.items():
+    for file_hash, (file_size, file_list) in duplicates.items():
         if len(file_list) < 2:
             continue
 
@@ -509,7 +1304,6 @@ def perform_actions(
         for file_to_process in process_list:
             norm_process_path = normalize_path(file_to_process, config)
             try:
-                file_size = os.lstat(norm_process_path).st_size
                 print(
                     f"  {action_verb}: {file_to_process} ({format_bytes(file_size)})",
                     end="\r",
@@ -532,10 +1326,15 @@ def perform_actions(
                             dest_path = os.path.join(
                                 config.quarantine_path, dest_name
                             )
-                        shutil.move(norm_process_path, dest_path)
+                        source_dev = os.lstat(norm_process_path).st_dev
+                        if source_dev == quarantine_dev:
+                            # Same filesystem: a single rename, no data copied
+                            os.replace(norm_process_path, dest_path)
+                        else:
+                            shutil.move(norm_process_path, dest_path)
                     elif config.action_mode == "link":
                         os.remove(norm_process_path)
-                        if platform.system() == "Windows":
+                        if _IS_WINDOWS:
                             win32file.CreateHardLink(
                                 norm_process_path, norm_keep_path
                             )
@@ -557,6 +1356,34 @@ def perform_actions(
     return total_processed_count, total_saved_size
 
 
+def _write_json_report(
+        out, timestamp: str, duplicates: Dict, hardlinks: Dict, config: Config
+):
+    """Streams a JSON report to the binary file out one group at a time.
+
+    The result is a single JSON object that --import-report can load, but
+    only one group is ever serialized in memory at once.
+    """
+    out.write(b"{\n")
+    out.write(b'  "scan_time": ' + _json_bytes(timestamp) + b",\n")
+    out.write(b'  "scan_directory": ' + _json_bytes(config.directory) + b",\n")
+    out.write(b'  "duplicates": {')
+    sep = b"\n"
+    for hash_val, (size, paths) in duplicates.items():
+        out.write(sep + b"    " + _json_bytes(hash_val) + b": ")
+        out.write(_json_bytes({"size": size, "paths": paths}))
+        sep = b",\n"
+    out.write(b"\n  },\n" if duplicates else b"},\n")
+    out.write(b'  "hardlinks": {')
+    sep = b"\n"
+    for id_val, (size, paths) in hardlinks.items():
+        # File IDs are bytes, which are not valid JSON object keys
+        out.write(sep + b"    " + _json_bytes(format_file_id(id_val)) + b": ")
+        out.write(_json_bytes({"size": size, "paths": paths}))
+        sep = b",\n"
+    out.write(b"\n  }\n}\n" if hardlinks else b"}\n}\n")
+
+
 def generate_report(
     duplicates: Dict, hardlinks: Dict, config: Config
 ) -> str:
@@ -571,47 +1398,45 @@ def generate_report(
     )
     print(f"\nGenerating {config.report_format.upper()} report...")
 
-    report_data = {
-        "scan_time": timestamp,
-        "scan_directory": config.directory,
-        "duplicates": duplicates,
-        "hardlinks": hardlinks,
-    }
-
     try:
         # --- THIS IS THE FIX ---
         # Open with UTF-8 encoding to handle special characters in filenames
         with open(report_filename, "w", encoding="utf-8", newline="") as f:
             if config.report_format == "json":
-                # Add ensure_ascii=False to write characters like '♡' directly
-                json.dump(report_data, f, indent=2, ensure_ascii=False)
+                # Nothing goes through the text layer, so write UTF-8 bytes
+                # straight to the underlying buffer
+                _write_json_report(
+                    f.buffer, timestamp, duplicates, hardlinks, config
+                )
             elif config.report_format == "csv":
                 writer = csv.writer(f)
                 writer.writerow(
                     ["Type", "Identifier", "Size (Bytes)", "File Path"]
                 )
-                for hash_val, paths in duplicates.items():
-                    size = os.path.getsize(paths[0])
+                for hash_val, (size, paths) in duplicates.items():
                     for path in paths:
                         writer.writerow(["Duplicate", hash_val[:12], size, path])
-                for id_val, paths in hardlinks.items():
-                    size = os.path.getsize(paths[0])
+                for id_val, (size, paths) in hardlinks.items():
                     for path in paths:
-                        writer.writerow(["Hardlink", id_val, size, path])
+                        writer.writerow(
+                            ["Hardlink", format_file_id(id_val), size, path]
+                        )
             else:  # txt
                 f.write("--- CloneReaper Scan Report ---\n")
                 f.write(f"Time: {timestamp}\n")
                 f.write(f"Directory: {config.directory}\n")
                 f.write("\n--- Duplicates ---\n")
-                for hash_val, paths in duplicates.items():
-                    size = format_bytes(os.path.getsize(paths[0]))
-                    f.write(f"Hash: {hash_val[:12]}... ({size})\n")
+                for hash_val, (size, paths) in duplicates.items():
+                    f.write(
+                        f"Hash: {hash_val[:12]}... ({format_bytes(size)})\n"
+                    )
                     for path in paths:
                         f.write(f"  - {path}\n")
                 f.write("\n--- Hardlinks ---\n")
-                for id_val, paths in hardlinks.items():
-                    size = format_bytes(os.path.getsize(paths[0]))
-                    f.write(f"ID: {id_val} ({size})\n")
+                for id_val, (size, paths) in hardlinks.items():
+                    f.write(
+                        f"ID: {format_file_id(id_val)} ({format_bytes(size)})\n"
+                    )
                     for path in paths:
                         f.write(f"  - {path}\n")
         print(f"Report saved to: {report_filename}")
@@ -621,6 +1446,134 @@ def generate_report(
         return ""
 
 
+def parse_report_group(
+        hash_val: str, group: Any, config: Config
+) -> Optional[Tuple[int, List[str]]]:
+    """Converts one duplicates or hardlinks entry of a JSON report to
+    (size, paths).
+
+    Reports written before sizes were recorded map keys straight to path
+    lists; for those the size is read from the first file on disk. Entries
+    with fewer than two files have nothing to act on and are skipped.
+    Raises ValueError if the entry has neither shape.
+    """
+    if isinstance(group, dict):
+        paths = group.get("paths")
+        if not isinstance(group.get("size"), int):
+            raise ValueError(f"Report entry {hash_val[:12]} has no valid size")
+    else:
+        paths = group
+    if not isinstance(paths, list) or not all(
+        isinstance(path, str) for path in paths
+    ):
+        raise ValueError(f"Report entry {hash_val[:12]} has no valid paths")
+    if len(paths) < 2:
+        logging.debug(f"Skipping report group {hash_val[:12]}: single file")
+        return None
+    if isinstance(group, dict):
+        return group["size"], paths
+    try:
+        size = os.lstat(normalize_path(paths[0], config)).st_size
+    except OSError as e:
+        logging.warning(f"Skipping report group {hash_val[:12]}: {e}")
+        return None
+    return size, paths
+
+
+def _iter_report_entries(f) -> Iterator[Tuple[str, str, Any]]:
+    """Yields (section, key, value) for every duplicates/hardlinks entry.
+
+    Walks the ijson event stream once, building only the current entry, so
+    both sections are read without holding the whole report or seeking back.
+    Raises ValueError if the report or either section is not an object.
+    """
+    builder = None
+    depth = 0
+    for prefix, event, value in ijson.parse(f):
+        if builder is None:
+            if prefix == "" and event not in ("start_map", "map_key", "end_map"):
+                raise ValueError("Malformed report: expected a JSON object")
+            if prefix in ("duplicates", "hardlinks") and event not in (
+                "start_map", "map_key", "end_map"
+            ):
+                raise ValueError(f"Malformed report: '{prefix}' is not an object")
+            if event == "map_key" and prefix in ("duplicates", "hardlinks"):
+                section, key = prefix, value
+                builder = ijson.ObjectBuilder()
+            continue
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            yield section, key, builder.value
+            builder = None
+
+
+def report_roots(config: Config) -> Tuple[str, ...]:
+    """Returns the directories reports may be imported from."""
+    return os.getcwd(), os.path.expanduser("~"), config.report_path
+
+
+def _safe_resolve(
+        user_path: str, allowed_roots: Tuple[str, ...]
+) -> Optional[str]:
+    """Canonicalizes a user-supplied file path and checks where it points.
+
+    Returns the resolved path if it is an existing file inside one of
+    allowed_roots after symlinks and '..' are resolved, otherwise None.
+    """
+    resolved = os.path.realpath(user_path)
+    if not os.path.isfile(resolved):
+        return None
+    for root in allowed_roots:
+        root = os.path.realpath(root)
+        try:
+            if os.path.commonpath([resolved, root]) == root:
+                return resolved
+        except ValueError:
+            # Paths on different drives (Windows) share no common path
+            continue
+    return None
+
+
+def load_report(
+        report_path: str, config: Config
+) -> Tuple[
+    Dict[str, Tuple[int, List[str]]], Dict[str, Tuple[int, List[str]]]
+]:
+    """Loads duplicates and hardlinks from a JSON report.
+
+    Streams the report with ijson when it is installed; otherwise falls
+    back to json.load. Raises ValueError if the report is malformed.
+    """
+    duplicates, hardlinks = {}, {}
+    if ijson_available:
+        with open(report_path, "rb") as f:
+            try:
+                for section, key, value in _iter_report_entries(f):
+                    target = hardlinks if section == "hardlinks" else duplicates
+                    if (group := parse_report_group(key, value, config)):
+                        target[key] = group
+            except ijson.JSONError as e:
+                raise ValueError(f"Malformed report: {e}") from e
+        return duplicates, hardlinks
+
+    with open(report_path, "rb") as f:
+        report_data = _json_loads(f.read())
+    if not isinstance(report_data, dict):
+        raise ValueError("Malformed report: expected a JSON object")
+    for section, target in (("duplicates", duplicates), ("hardlinks", hardlinks)):
+        entries = report_data.get(section, {})
+        if not isinstance(entries, dict):
+            raise ValueError(f"Malformed report: '{section}' is not an object")
+        for key, value in entries.items():
+            if (group := parse_report_group(key, value, config)):
+                target[key] = group
+    return duplicates, hardlinks
+
+
 def send_email_report(report_path: str, config: Config):
     """Sends the generated report via email."""
     if not config.email_config.get("enabled") or not report_path:
@@ -691,6 +1644,12 @@ def trigger_media_server_scan(config: Config):
 
 
 # --- Interactive UI Functions ---
+def notify_integrations(report_path: str, config: Config):
+    """Sends the email report, then asks the media server to rescan."""
+    send_email_report(report_path, config)
+    trigger_media_server_scan(config)
+
+
 def ask_yes_no(prompt: str, default_yes: bool = False) -> bool:
     """Asks a yes/no question."""
     suffix = "(Y/n)" if default_yes else "(y/N)"
@@ -704,6 +1663,22 @@ def ask_yes_no(prompt: str, default_yes: bool = False) -> bool:
             return False
         print("Invalid input. Please enter 'yes' or 'no'.")
 
+
+def confirm_destructive(action: str, count: int, size: int) -> bool:
+    """Asks the user to type a phrase naming the action and file count.
+
+    A single typed phrase replaces repeated yes/no prompts; reflexively
+    pressing 'y' is not enough to confirm.
+    """
+    expected = f"{action.upper()} {count}"
+    print(
+        f"This will {action} {count} files ({format_bytes(size)}). "
+        f"This cannot be undone."
+    )
+    response = input(f"Type '{expected}' to confirm: ").strip()
+    return hmac.compare_digest(response.encode("utf-8"), expected.encode("utf-8"))
+
+
 def configure_email(config: Config):
     """Interactive sub-menu for configuring email settings."""
     print("\n--- Configure Email Settings ---")
@@ -728,10 +1703,32 @@ def configure_email(config: Config):
         f"Recipient Email [{cfg.get('recipient', cfg.get('user', ''))}]: "
     ).strip() or cfg.get("recipient", cfg.get("user", ""))
 
-def get_choice(prompt: str, options: List[str]) -> int:
+# Menu choices are fixed, so build them once rather than on every visit
+_ACTION_OPTIONS = (
+    "None (report only)",
+    "Safe Delete (move to Quarantine)",
+    "Permanent Delete",
+    "Replace with Hardlinks",
+)
+_ACTION_MAP = ("none", "quarantine", "delete", "link")
+_STRATEGY_OPTIONS = ("first", "oldest", "newest", "shortest", "longest")
+_REPORT_OPTIONS = ("txt", "json", "csv")
+_MENU_OPTIONS = (
+    "Configure Scan Settings",
+    "Configure Actions (Delete, Quarantine, Link)",
+    "Configure Reporting",
+    "Configure Email & Integrations",
+    "RUN SCAN from configured path",
+    "IMPORT REPORT and run actions",
+    "Exit",
+)
+
+
+def get_choice(prompt: str, options: Sequence[str]) -> int:
     """Gets a numbered choice from a list of options."""
-    for i, option in enumerate(options):
-        print(f"  {i + 1}. {option}")
+    sys.stdout.write(
+        "".join(f"  {i + 1}. {option}\n" for i, option in enumerate(options))
+    )
     while True:
         try:
             choice = input(f"{prompt} (1-{len(options)}): ").strip()
@@ -778,9 +1775,8 @@ def configure_scan(config: Config):
             print("Invalid input. Please enter a number.")
 
     # Hash Algorithm
-    available_algos = sorted(list(hashlib.algorithms_available))
     print("Available hash algorithms:")
-    for i, algo in enumerate(available_algos):
+    for i, algo in enumerate(_AVAILABLE_ALGOS_TUPLE):
         print(f"  {i+1}. {algo}", end="  ")
         if (i + 1) % 5 == 0:
             print()
@@ -793,23 +1789,40 @@ def configure_scan(config: Config):
             break
         try:
             index = int(algo_choice) - 1
-            if 0 <= index < len(available_algos):
-                config.hash_algo = available_algos[index]
+            if 0 <= index < len(_AVAILABLE_ALGOS_TUPLE):
+                config.hash_algo = _AVAILABLE_ALGOS_TUPLE[index]
                 break
             else:
                 print("Invalid number.")
         except ValueError:
-            if algo_choice in available_algos:
+            if algo_choice in _AVAILABLE_ALGOS_SET:
                 config.hash_algo = algo_choice
                 break
             else:
                 print(f"Invalid algorithm name '{algo_choice}'.")
 
     # Other toggles
+    if config.min_size == 0:
+        config.include_empty_files = ask_yes_no(
+            "Report empty (zero-byte) files as duplicates?",
+            config.include_empty_files,
+        )
     config.partial_hash = ask_yes_no(
         "Use partial hash pre-check (faster)?", config.partial_hash
     )
-    if platform.system() == "Windows":
+    config.verify_duplicates = ask_yes_no(
+        "Verify duplicates byte-for-byte after hashing (slower)?",
+        config.verify_duplicates,
+    )
+    config.collapse_duplicate_dirs = ask_yes_no(
+        "Show fully duplicated directories as single entries?",
+        config.collapse_duplicate_dirs,
+    )
+    config.use_hash_cache = ask_yes_no(
+        "Cache file hashes between scans (faster re-scans)?",
+        config.use_hash_cache,
+    )
+    if _IS_WINDOWS:
         config.long_paths_enabled = ask_yes_no(
             "Enable Windows long path support?", config.long_paths_enabled
         )
@@ -827,21 +1840,13 @@ def configure_actions(config: Config):
     )
 
     print("Choose action for duplicates:")
-    action_options = [
-        "None (report only)",
-        "Safe Delete (move to Quarantine)",
-        "Permanent Delete",
-        "Replace with Hardlinks",
-    ]
-    action_map = ["none", "quarantine", "delete", "link"]
-    choice_idx = get_choice("Select action", action_options)
-    config.action_mode = action_map[choice_idx]
+    choice_idx = get_choice("Select action", _ACTION_OPTIONS)
+    config.action_mode = _ACTION_MAP[choice_idx]
 
     if config.action_mode != "none":
         print("Choose which file to KEEP in each duplicate set:")
-        strategy_options = ["first", "oldest", "newest", "shortest", "longest"]
-        strategy_idx = get_choice("Select keep strategy", strategy_options)
-        config.keep_strategy = strategy_options[strategy_idx]
+        strategy_idx = get_choice("Select keep strategy", _STRATEGY_OPTIONS)
+        config.keep_strategy = _STRATEGY_OPTIONS[strategy_idx]
 
     if config.action_mode == "quarantine":
         default_q_path = os.path.join(
@@ -853,10 +1858,10 @@ def configure_actions(config: Config):
         config.quarantine_path = q_path or default_q_path
 
     if config.action_mode == "delete":
-        print("Deletion is permanent and cannot be undone.")
-        config.confirmations = 3 if ask_yes_no(
-            "Enable TRIPLE confirmation for deletion?", True
-        ) else 2
+        print(
+            "Deletion is permanent and cannot be undone. You will be asked "
+            "to type a confirmation phrase before anything is deleted."
+        )
 
 
 def configure_reporting(config: Config):
@@ -866,9 +1871,8 @@ def configure_reporting(config: Config):
         "Generate a report file?", config.enable_reports
     )
     if config.enable_reports:
-        report_options = ["txt", "json", "csv"]
-        choice_idx = get_choice("Select report format", report_options)
-        config.report_format = report_options[choice_idx]
+        choice_idx = get_choice("Select report format", _REPORT_OPTIONS)
+        config.report_format = _REPORT_OPTIONS[choice_idx]
 
     # Placeholder for email/media server config
     config.email_config["enabled"] = ask_yes_no(
@@ -881,9 +1885,7 @@ def configure_reporting(config: Config):
     )
 
 
-def display_banner():
-    """Displays the application banner."""
-    banner = r"""
+BANNER = r"""
  ██████╗██╗      ██████╗ ███╗   ██╗███████╗██████╗ ███████╗ █████╗ ██████╗ ███████╗██████╗     ██████╗ ██████╗ ██╗███╗   ███╗███████╗
 ██╔════╝██║     ██╔═══██╗████╗  ██║██╔════╝██╔══██╗██╔════╝██╔══██╗██╔══██╗██╔════╝██╔══██╗    ██╔══██╗██╔══██╗██║████╗ ████║██╔════╝
 ██║     ██║     ██║   ██║██╔██╗ ██║█████╗  ██████╔╝█████╗  ███████║██████╔╝█████╗  ██████╔╝    ██████╔╝██████╔╝██║██╔████╔██║█████╗  
@@ -891,23 +1893,35 @@ def display_banner():
 ╚██████╗███████╗╚██████╔╝██║ ╚████║███████╗██║  ██║███████╗██║  ██║██║     ███████╗██║  ██║    ██║     ██║  ██║██║██║ ╚═╝ ██║███████╗
  ╚═════╝╚══════╝ ╚═════╝ ╚═╝  ╚═══╝╚══════╝╚═╝  ╚═╝╚══════╝╚═╝  ╚═╝╚═╝     ╚══════╝╚═╝  ╚═╝    ╚═╝     ╚═╝  ╚═╝╚═╝╚═╝     ╚═╝╚══════╝
                                                                                                                                      
+
 """
-    print(banner)
+
+
+def display_banner():
+    """Displays the application banner when stdout is a terminal.
+
+    Piped or redirected output (scripts, logs) gets no ASCII art.
+    """
+    if sys.stdout.isatty():
+        sys.stdout.write(BANNER)
 
 
 def display_summary(config: Config):
     """Prints a summary of the current configuration."""
-    print("\n--- Configuration Summary ---")
-    print(f"  Scan Path:         {config.directory or 'Not Set'}")
-    print(f"  Min File Size:     {config.min_size} bytes")
-    print(f"  Action:            {config.action_mode.capitalize()}")
+    lines = [
+        "\n--- Configuration Summary ---",
+        f"  Scan Path:         {config.directory or 'Not Set'}",
+        f"  Min File Size:     {config.min_size} bytes",
+        f"  Action:            {config.action_mode.capitalize()}",
+    ]
     if config.action_mode != "none":
-        print(f"  Keep Strategy:     {config.keep_strategy.capitalize()}")
-        print(f"  Dry Run:           {'YES' if config.dry_run else 'NO'}")
-    print(f"  Reporting:         {'Enabled' if config.enable_reports else 'Disabled'}")
+        lines.append(f"  Keep Strategy:     {config.keep_strategy.capitalize()}")
+        lines.append(f"  Dry Run:           {'YES' if config.dry_run else 'NO'}")
+    lines.append(f"  Reporting:         {'Enabled' if config.enable_reports else 'Disabled'}")
     if config.enable_reports:
-        print(f"  Report Format:     {config.report_format.upper()}")
-    print("-----------------------------")
+        lines.append(f"  Report Format:     {config.report_format.upper()}")
+    lines.append("-----------------------------")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def run_scan_and_process(config: Config):
@@ -922,84 +1936,160 @@ def run_scan_and_process(config: Config):
     if config.import_report_path:
         print(f"Loading results from report: {config.import_report_path}")
         try:
-            with open(config.import_report_path, "r") as f:
-                report_data = json.load(f)
-                duplicates = report_data.get("duplicates", {})
-                hardlinks = report_data.get("hardlinks", {})
+            duplicates, hardlinks = load_report(
+                config.import_report_path, config
+            )
             print("Successfully loaded results from report.")
-        except (IOError, json.JSONDecodeError) as e:
+        except (IOError, ValueError) as e:
             print(f"Error loading report: {e}. Aborting.")
             return
     else:
         # 1. Find by size
-        potential_groups = find_potential_duplicates_by_size(config)
+        potential_groups, linked_files = find_potential_duplicates_by_size(
+            config
+        )
+
+        # Empty files are all identical, so there is nothing to read
+        empty_files = potential_groups.pop(0, [])
+        if empty_files and not config.include_empty_files:
+            print(f"Skipping {len(empty_files)} empty files.")
 
         # 2. Filter hardlinks
         groups_to_hash = potential_groups
         if config.check_hardlinks:
             groups_to_hash, hardlinks, _ = identify_hardlinks(
-                potential_groups, config
+                potential_groups, linked_files, config
             )
 
-        # 3. Find by hash
-        duplicates = identify_duplicates_by_hash(groups_to_hash, config)
+        # Files that can never be linked are not worth sampling or hashing
+        if config.action_mode == "link":
+            groups_to_hash = drop_unlinkable_files(groups_to_hash)
+
+        # 3. Split size groups by head/tail samples
+        if config.partial_hash:
+            groups_to_hash = partial_hash_groups(groups_to_hash, config)
 
-    # 4. Display results
+        # 4. Find by hash
+        cache = None
+        if config.use_hash_cache:
+            try:
+                cache = HashCache(
+                    config.hash_cache_path,
+                    config.hash_algo,
+                    config.cache_invalidate_days,
+                )
+            except sqlite3.Error as e:
+                logging.warning(
+                    f"Could not open hash cache {config.hash_cache_path}: {e}"
+                )
+        try:
+            duplicates = identify_duplicates_by_hash(
+                groups_to_hash, config, cache
+            )
+        finally:
+            if cache:
+                cache.close()
+        if duplicates and needs_verification(config):
+            if not config.verify_duplicates:
+                print(
+                    f"{config.hash_algo} is not a cryptographic hash; "
+                    f"verifying matches before {config.action_mode} actions."
+                )
+            duplicates = verify_duplicates(duplicates, config)
+        if empty_files and config.include_empty_files:
+            # The configured algorithm's digest of no data
+            empty_hash = hex_digest(new_hasher(config.hash_algo))
+            duplicates[empty_hash] = (0, [f.path for f in empty_files])
+
+    duplicate_dirs = {}
+    if config.collapse_duplicate_dirs and duplicates:
+        duplicate_dirs = find_duplicate_directories(duplicates, config)
+    scan_result = summarize_duplicates(duplicates, config)
+
+    # 5. Display results
     print("\n--- Scan Results ---")
     if not duplicates and not hardlinks:
         print("No duplicate files or hardlinks found.")
     else:
         if hardlinks:
             print("\nHardlinks Found (sharing space, not true duplicates):")
-            for file_id, paths in hardlinks.items():
-                size = format_bytes(os.path.getsize(paths[0]))
-                print(f"  ID: {file_id} ({len(paths)} links, Size: {size})")
+            for file_id, (file_size, paths) in hardlinks.items():
+                size = format_bytes(file_size)
+                print(
+                    f"  ID: {format_file_id(file_id)} ({len(paths)} links, "
+                    f"Size: {size})"
+                )
+        collapsed_dirs = set()
+        if duplicate_dirs:
+            print("\nDuplicate Directories Found:")
+            for dir_hash, (size, dirs) in duplicate_dirs.items():
+                collapsed_dirs.update(dirs)
+                print(
+                    f"  Hash: {dir_hash[:12]}... ({len(dirs)} copies, "
+                    f"Size: {format_bytes(size)})"
+                )
+                for directory in dirs:
+                    print(f"    - {directory}")
         if duplicates:
-            wasted_space = calculate_wasted_space(duplicates, config)
             print("\nDuplicate Files Found:")
             print(
-                f"(Total potential space savings: {format_bytes(wasted_space)})"
+                f"(Total potential space savings: "
+                f"{format_bytes(scan_result.wasted_bytes)})"
             )
-            for file_hash, paths in duplicates.items():
-                size = format_bytes(os.path.getsize(paths[0]))
+            hidden_groups = 0
+            for file_hash, (size, paths) in duplicates.items():
+                if collapsed_dirs and all(
+                    _is_inside_any(path, collapsed_dirs) for path in paths
+                ):
+                    hidden_groups += 1
+                    continue
+                print(
+                    f"  Hash: {file_hash[:12]}... ({len(paths)} files, "
+                    f"Size: {format_bytes(size)})"
+                )
+            if hidden_groups:
                 print(
-                    f"  Hash: {file_hash[:12]}... ({len(paths)} files, Size: {size})"
+                    f"  ({hidden_groups} more sets inside the duplicate "
+                    f"directories above)"
                 )
 
-    # 5. Generate Report
+    # 6. Generate Report
     report_path = generate_report(duplicates, hardlinks, config)
 
-    # 6. Perform Actions
+    # 7. Perform Actions
+    notifier = None
     if duplicates and config.action_mode != "none":
         final_confirm = True
         if not config.dry_run:
-            wasted_space = calculate_wasted_space(duplicates, config)
-            num_files = sum(len(v) - 1 for v in duplicates.values())
             print("\n--- FINAL CONFIRMATION ---")
-            for i in range(config.confirmations):
-                prompt = (
-                    f"Really {config.action_mode} {num_files} files "
-                    f"({format_bytes(wasted_space)})? This cannot be undone."
-                )
-                if not ask_yes_no(prompt, False):
-                    final_confirm = False
-                    break
+            final_confirm = confirm_destructive(
+                config.action_mode,
+                scan_result.file_count,
+                scan_result.wasted_bytes,
+            )
 
         if final_confirm:
             processed_count, saved_size = perform_actions(duplicates, config)
+            # Trigger integrations after action. They are network-bound, so
+            # run them alongside the summary instead of ahead of it.
+            if not config.dry_run:
+                notifier = threading.Thread(
+                    target=notify_integrations,
+                    args=(report_path, config),
+                    name="clonereaper-notify",
+                )
+                notifier.start()
             action_type = "processed" if config.dry_run else "completed"
             print(
                 f"\nAction {action_type}. "
                 f"Files processed: {processed_count}. "
                 f"Space saved/recovered: {format_bytes(saved_size)}."
             )
-            # Trigger integrations after action
-            if not config.dry_run:
-                send_email_report(report_path, config)
-                trigger_media_server_scan(config)
         else:
             print("Action cancelled by user.")
 
+    if notifier:
+        notifier.join()
     end_time = time.time()
     print(f"\nOperation finished in {end_time - start_time:.2f} seconds.")
 
@@ -1019,17 +2109,8 @@ def main_interactive():
     # The main loop remains mostly the same
     while True:
         display_summary(config)
-        menu_options = [
-            "Configure Scan Settings",
-            "Configure Actions (Delete, Quarantine, Link)",
-            "Configure Reporting",
-            "Configure Email & Integrations",
-            "RUN SCAN from configured path",
-            "IMPORT REPORT and run actions",
-            "Exit",
-        ]
         # Adjust the choice numbers based on the new menu length
-        choice = get_choice("\nMain Menu", menu_options)
+        choice = get_choice("\nMain Menu", _MENU_OPTIONS)
 
         if choice == 0:
             configure_scan(config)
@@ -1044,11 +2125,15 @@ def main_interactive():
             run_scan_and_process(config)
         elif choice == 5:
             path = input("Enter the path to the JSON report file: ").strip()
-            if os.path.isfile(path):
-                config.import_report_path = path
+            resolved = _safe_resolve(path, report_roots(config))
+            if resolved:
+                config.import_report_path = resolved
                 run_scan_and_process(config)
             else:
-                print(f"Error: '{path}' is not a valid file.")
+                print(
+                    f"Error: '{path}' is not a file inside the current, "
+                    f"home or report directory."
+                )
         elif choice == 6:  # Exit
             # --- THIS IS THE FIX ---
             # Save the configuration before exiting
@@ -1057,8 +2142,11 @@ def main_interactive():
             break
 
 
-def main():
-    """Main entry point, handles command-line args or launches interactive mode."""
+def _build_arg_parser():
+    """Builds the command-line parser. Only needed when arguments are given."""
+    # Imported here so that interactive launches skip argparse's startup cost
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="CloneReaper: Find and manage duplicate files.",
         formatter_class=argparse.RawTextHelpFormatter,
@@ -1088,10 +2176,47 @@ def main():
         "--import-report",
         help="Import a JSON report to perform actions on, skipping the scan.",
     )
+    parser.add_argument(
+        "--hash-algo",
+        choices=_AVAILABLE_ALGOS_TUPLE,
+        metavar="ALGO",
+        help=f"Hash algorithm to compare files with (default: {DEFAULT_HASH_ALGO}).",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Confirm duplicates byte-for-byte after hashing.",
+    )
+    parser.add_argument(
+        "--collapse-dirs",
+        action="store_true",
+        help="Report fully duplicated directories as single entries.",
+    )
+    parser.add_argument(
+        "--cache-path",
+        metavar="PATH",
+        help="Reuse file hashes from a SQLite hash cache at PATH, "
+             "creating it if needed.",
+    )
+    parser.add_argument(
+        "--invalidate-cache-days",
+        type=int,
+        default=0,
+        metavar="DAYS",
+        help="Drop hash cache entries older than DAYS (default: keep all).",
+    )
     # Add more arguments to mirror all Config options as needed
     # e.g., --min-size, --keep-strategy, --dry-run, etc.
+    return parser
 
-    args = parser.parse_args()
+
+def main():
+    """Main entry point, handles command-line args or launches interactive mode."""
+    if len(sys.argv) == 1:
+        main_interactive()
+        return
+
+    args = _build_arg_parser().parse_args()
 
     if not args.directory and not args.import_report:
         main_interactive()
@@ -1108,7 +2233,24 @@ def main():
         config.directory = args.directory
         config.action_mode = args.action
         config.dry_run = False  # Default to active mode for automation
-        config.import_report_path = args.import_report
+        if args.import_report:
+            config.import_report_path = _safe_resolve(
+                args.import_report, report_roots(config)
+            )
+            if not config.import_report_path:
+                print(
+                    f"Error: '{args.import_report}' is not a file inside the "
+                    f"current, home or report directory."
+                )
+                sys.exit(1)
+        if args.hash_algo:
+            config.hash_algo = args.hash_algo
+        config.verify_duplicates = args.verify
+        config.collapse_duplicate_dirs = args.collapse_dirs
+        if args.cache_path:
+            config.use_hash_cache = True
+            config.hash_cache_path = args.cache_path
+        config.cache_invalidate_days = args.invalidate_cache_days
 
         if args.report_format:
             config.enable_reports = True